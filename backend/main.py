@@ -2,12 +2,24 @@
 FastAPI Backend for Resume ATS Analyzer - Professional Edition
 With MongoDB Atlas Integration
 """
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
+from starlette.datastructures import State
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import asynccontextmanager
-from datetime import datetime
-import json
+from datetime import datetime, timezone
+from typing import Optional
+from cachetools import TTLCache
+import asyncio
+import brotli
+import gzip
+import hashlib
+import multiprocessing
+import os
+import orjson
 
 from utils import (
     extract_text_from_pdf,
@@ -15,6 +27,7 @@ from utils import (
     generate_full_analysis,
 )
 from database import (
+    Database,
     connect_to_mongodb,
     close_mongodb_connection,
     save_analysis,
@@ -27,180 +40,297 @@ from database import (
 )
 
 
+# Frontend origins allowed to call the API (comma-separated), e.g. the deployed static site URL
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",")
+    if origin.strip()
+]
+
+# Largest resume upload accepted by /analyze
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10 MB
+
+# Leading bytes of each supported resume format -> (expected extension, text extractor)
+RESUME_FORMATS = {
+    b"%PDF": (".pdf", extract_text_from_pdf),
+    b"PK\x03\x04": (".docx", extract_text_from_docx),  # DOCX is a ZIP container
+}
+
+# Recent analysis results keyed by a digest of (resume text, job description);
+# repeated submissions while a user iterates are answered without re-running the analysis
+ANALYSIS_CACHE_SIZE = 512
+ANALYSIS_CACHE_TTL = 300  # seconds
+
+_analysis_cache = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+_analysis_inflight = {}  # digest -> Task currently computing that analysis
+
+# Optional worker processes for generate_full_analysis. A single analysis takes under
+# a millisecond, less than a round trip to a worker, so the default (0) keeps analyses
+# on the threadpool; workers only pay off for many concurrent analyses on spare cores
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0"))
+
+
+def _create_analysis_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Creates the analysis worker pool, or returns None when ANALYSIS_WORKERS is 0.
+    Workers are spawned (not forked) so they don't inherit the MongoDB driver's threads.
+    """
+    if ANALYSIS_WORKERS <= 0:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=ANALYSIS_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
 # Lifespan context manager for MongoDB connection
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
-    # Startup: Connect to MongoDB
-    await connect_to_mongodb()
+    # Startup: Create the analysis worker pool, if configured
+    app.state.analysis_pool = _create_analysis_pool()
+    # Connect to MongoDB (None if the connection failed)
+    app.state.db = await connect_to_mongodb()
     yield
-    # Shutdown: Close MongoDB connection
-    await close_mongodb_connection()
+    # Shutdown: Close MongoDB connection and stop the analysis workers
+    await close_mongodb_connection(app.state.db)
+    if app.state.analysis_pool is not None:
+        app.state.analysis_pool.shutdown(cancel_futures=True)
+
+
+def get_optional_db(request: Request) -> Optional[Database]:
+    """Dependency returning the app's database, or None if it isn't connected."""
+    return request.app.state.db
+
+
+def get_db(db: Optional[Database] = Depends(get_optional_db)) -> Database:
+    """Dependency returning the app's database; fails the request if it isn't connected."""
+    if db is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Database not connected"
+        )
+    return db
 
 
 app = FastAPI(
     title="Resume ATS Analyzer Pro",
     description="Professional Resume Analysis with ATS Scoring, Keyword Analysis, and Detailed Suggestions - With MongoDB Atlas",
     version="2.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Enable CORS for frontend
+# Enable CORS for frontend; explicit lists let browsers cache preflights for max_age seconds
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, restrict this
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,
 )
 
 
+# Cache headers for endpoints whose payload never changes between deploys
+STATIC_CACHE_HEADERS = {"Cache-Control": "public, max-age=86400"}
+
+
+def _encode_static_json(payload: dict) -> bytes:
+    """Serializes a constant payload once at import time."""
+    return orjson.dumps(payload)
+
+
+def _static_json_response(body: bytes) -> Response:
+    """Wraps a pre-serialized JSON body in a cacheable response."""
+    return Response(content=body, media_type="application/json", headers=STATIC_CACHE_HEADERS)
+
+
+def _precompress(body: bytes) -> dict:
+    """Compresses a static body once per supported encoding, best first."""
+    return {
+        "br": brotli.compress(body, quality=11),
+        "gzip": gzip.compress(body, compresslevel=9),
+    }
+
+
+def _accepted_encodings(request: Request) -> set:
+    """Content codings the client accepts (ignoring any explicitly given q=0)."""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _compressed_static_json_response(request: Request, body: bytes, compressed: dict) -> Response:
+    """Serves the best precompressed variant of a static JSON body the client accepts."""
+    accepted = _accepted_encodings(request)
+    headers = {**STATIC_CACHE_HEADERS, "Vary": "Accept-Encoding"}
+    for encoding, compressed_body in compressed.items():
+        if encoding in accepted:
+            headers["Content-Encoding"] = encoding
+            return Response(content=compressed_body, media_type="application/json", headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+ROOT_INFO = {
+    "message": "Resume ATS Analyzer Pro API is running with MongoDB Atlas.",
+    "version": "2.1.0",
+    "database": "MongoDB Atlas",
+    "endpoints": {
+        "analyze": "POST /analyze - Analyze resume against job description",
+        "quick_score": "POST /quick-score - Quick scoring without file upload",
+        "history": "GET /history - Get analysis history from database",
+        "history_detail": "GET /history/{id} - Get specific analysis by ID",
+        "delete_analysis": "DELETE /history/{id} - Delete specific analysis",
+        "clear_history": "DELETE /history - Clear all history",
+        "stats": "GET /stats - Get analysis statistics",
+        "tips": "GET /tips - Get resume writing tips",
+        "industries": "GET /industries - Get industry-specific keywords"
+    }
+}
+_ROOT_JSON = _encode_static_json(ROOT_INFO)
+
+
 @app.get("/")
 async def root():
-    return {
-        "message": "Resume ATS Analyzer Pro API is running with MongoDB Atlas.",
-        "version": "2.1.0",
-        "database": "MongoDB Atlas",
-        "endpoints": {
-            "analyze": "POST /analyze - Analyze resume against job description",
-            "quick_score": "POST /quick-score - Quick scoring without file upload",
-            "history": "GET /history - Get analysis history from database",
-            "history_detail": "GET /history/{id} - Get specific analysis by ID",
-            "delete_analysis": "DELETE /history/{id} - Delete specific analysis",
-            "clear_history": "DELETE /history - Clear all history",
-            "stats": "GET /stats - Get analysis statistics",
-            "tips": "GET /tips - Get resume writing tips",
-            "industries": "GET /industries - Get industry-specific keywords"
+    return _static_json_response(_ROOT_JSON)
+
+
+RESUME_TIPS = {
+    "tips": [
+        {
+            "category": "Keywords",
+            "title": "Mirror the Job Description",
+            "description": "Use exact phrases and keywords from the job posting in your resume."
+        },
+        {
+            "category": "Keywords",
+            "title": "Include Industry Buzzwords",
+            "description": "Research and include relevant industry-specific terminology."
+        },
+        {
+            "category": "Format",
+            "title": "Use Standard Section Headers",
+            "description": "Stick to traditional headers like 'Experience', 'Education', 'Skills' for ATS compatibility."
+        },
+        {
+            "category": "Format",
+            "title": "Avoid Tables and Graphics",
+            "description": "ATS systems often struggle with complex formatting. Keep it simple."
+        },
+        {
+            "category": "Format",
+            "title": "Use Standard Fonts",
+            "description": "Stick to Arial, Calibri, or Times New Roman for best ATS parsing."
+        },
+        {
+            "category": "Content",
+            "title": "Quantify Achievements",
+            "description": "Use numbers and percentages to demonstrate impact (e.g., 'Increased sales by 30%')."
+        },
+        {
+            "category": "Content",
+            "title": "Start with Action Verbs",
+            "description": "Begin each bullet point with strong action verbs like Led, Developed, Achieved."
+        },
+        {
+            "category": "Content",
+            "title": "Tailor for Each Application",
+            "description": "Customize your resume for each job application to match specific requirements."
+        },
+        {
+            "category": "Length",
+            "title": "Keep It Concise",
+            "description": "1 page for early career, 2 pages for experienced professionals."
+        },
+        {
+            "category": "Technical",
+            "title": "Save as PDF or DOCX",
+            "description": "These formats preserve formatting and are ATS-friendly."
         }
-    }
+    ]
+}
+_TIPS_JSON = _encode_static_json(RESUME_TIPS)
 
 
 @app.get("/tips")
 async def get_resume_tips():
     """Returns professional resume writing tips."""
-    return {
-        "tips": [
-            {
-                "category": "Keywords",
-                "title": "Mirror the Job Description",
-                "description": "Use exact phrases and keywords from the job posting in your resume."
-            },
-            {
-                "category": "Keywords",
-                "title": "Include Industry Buzzwords",
-                "description": "Research and include relevant industry-specific terminology."
-            },
-            {
-                "category": "Format",
-                "title": "Use Standard Section Headers",
-                "description": "Stick to traditional headers like 'Experience', 'Education', 'Skills' for ATS compatibility."
-            },
-            {
-                "category": "Format",
-                "title": "Avoid Tables and Graphics",
-                "description": "ATS systems often struggle with complex formatting. Keep it simple."
-            },
-            {
-                "category": "Format",
-                "title": "Use Standard Fonts",
-                "description": "Stick to Arial, Calibri, or Times New Roman for best ATS parsing."
-            },
-            {
-                "category": "Content",
-                "title": "Quantify Achievements",
-                "description": "Use numbers and percentages to demonstrate impact (e.g., 'Increased sales by 30%')."
-            },
-            {
-                "category": "Content",
-                "title": "Start with Action Verbs",
-                "description": "Begin each bullet point with strong action verbs like Led, Developed, Achieved."
-            },
-            {
-                "category": "Content",
-                "title": "Tailor for Each Application",
-                "description": "Customize your resume for each job application to match specific requirements."
-            },
-            {
-                "category": "Length",
-                "title": "Keep It Concise",
-                "description": "1 page for early career, 2 pages for experienced professionals."
-            },
-            {
-                "category": "Technical",
-                "title": "Save as PDF or DOCX",
-                "description": "These formats preserve formatting and are ATS-friendly."
-            }
-        ]
+    return _static_json_response(_TIPS_JSON)
+
+
+INDUSTRY_KEYWORDS = {
+    "industries": {
+        "software_engineering": {
+            "name": "Software Engineering",
+            "keywords": [
+                "Python", "JavaScript", "React", "Node.js", "AWS", "Docker", "Kubernetes",
+                "CI/CD", "Agile", "Scrum", "Git", "REST API", "Microservices", "SQL",
+                "System Design", "Testing", "DevOps", "Cloud", "Full Stack", "Backend"
+            ]
+        },
+        "data_science": {
+            "name": "Data Science & Analytics",
+            "keywords": [
+                "Python", "R", "SQL", "Machine Learning", "Deep Learning", "TensorFlow",
+                "PyTorch", "Pandas", "NumPy", "Data Visualization", "Tableau", "Power BI",
+                "Statistics", "A/B Testing", "NLP", "Computer Vision", "Big Data", "Spark"
+            ]
+        },
+        "product_management": {
+            "name": "Product Management",
+            "keywords": [
+                "Product Strategy", "Roadmap", "User Research", "A/B Testing", "Agile",
+                "Scrum", "JIRA", "Cross-functional", "Stakeholder Management", "KPIs",
+                "MVP", "User Stories", "Sprint Planning", "Product Discovery", "Analytics"
+            ]
+        },
+        "marketing": {
+            "name": "Marketing",
+            "keywords": [
+                "Digital Marketing", "SEO", "SEM", "Content Marketing", "Social Media",
+                "Analytics", "Google Analytics", "Campaign Management", "Brand Strategy",
+                "Email Marketing", "PPC", "Conversion Rate", "ROI", "Marketing Automation"
+            ]
+        },
+        "design": {
+            "name": "UX/UI Design",
+            "keywords": [
+                "Figma", "Sketch", "Adobe XD", "User Research", "Wireframing", "Prototyping",
+                "Design Systems", "Usability Testing", "Information Architecture", "Interaction Design",
+                "Visual Design", "Accessibility", "Responsive Design", "Design Thinking"
+            ]
+        },
+        "finance": {
+            "name": "Finance & Accounting",
+            "keywords": [
+                "Financial Analysis", "Budgeting", "Forecasting", "Excel", "Financial Modeling",
+                "GAAP", "Auditing", "Compliance", "Risk Management", "SAP", "QuickBooks",
+                "Account Reconciliation", "Financial Reporting", "Variance Analysis", "Taxation"
+            ]
+        }
     }
+}
+_INDUSTRIES_JSON = _encode_static_json(INDUSTRY_KEYWORDS)
+_INDUSTRIES_COMPRESSED = _precompress(_INDUSTRIES_JSON)
 
 
 @app.get("/industries")
-async def get_industry_keywords():
+async def get_industry_keywords(request: Request):
     """Returns common keywords for different industries/roles."""
-    return {
-        "industries": {
-            "software_engineering": {
-                "name": "Software Engineering",
-                "keywords": [
-                    "Python", "JavaScript", "React", "Node.js", "AWS", "Docker", "Kubernetes",
-                    "CI/CD", "Agile", "Scrum", "Git", "REST API", "Microservices", "SQL",
-                    "System Design", "Testing", "DevOps", "Cloud", "Full Stack", "Backend"
-                ]
-            },
-            "data_science": {
-                "name": "Data Science & Analytics",
-                "keywords": [
-                    "Python", "R", "SQL", "Machine Learning", "Deep Learning", "TensorFlow",
-                    "PyTorch", "Pandas", "NumPy", "Data Visualization", "Tableau", "Power BI",
-                    "Statistics", "A/B Testing", "NLP", "Computer Vision", "Big Data", "Spark"
-                ]
-            },
-            "product_management": {
-                "name": "Product Management",
-                "keywords": [
-                    "Product Strategy", "Roadmap", "User Research", "A/B Testing", "Agile",
-                    "Scrum", "JIRA", "Cross-functional", "Stakeholder Management", "KPIs",
-                    "MVP", "User Stories", "Sprint Planning", "Product Discovery", "Analytics"
-                ]
-            },
-            "marketing": {
-                "name": "Marketing",
-                "keywords": [
-                    "Digital Marketing", "SEO", "SEM", "Content Marketing", "Social Media",
-                    "Analytics", "Google Analytics", "Campaign Management", "Brand Strategy",
-                    "Email Marketing", "PPC", "Conversion Rate", "ROI", "Marketing Automation"
-                ]
-            },
-            "design": {
-                "name": "UX/UI Design",
-                "keywords": [
-                    "Figma", "Sketch", "Adobe XD", "User Research", "Wireframing", "Prototyping",
-                    "Design Systems", "Usability Testing", "Information Architecture", "Interaction Design",
-                    "Visual Design", "Accessibility", "Responsive Design", "Design Thinking"
-                ]
-            },
-            "finance": {
-                "name": "Finance & Accounting",
-                "keywords": [
-                    "Financial Analysis", "Budgeting", "Forecasting", "Excel", "Financial Modeling",
-                    "GAAP", "Auditing", "Compliance", "Risk Management", "SAP", "QuickBooks",
-                    "Account Reconciliation", "Financial Reporting", "Variance Analysis", "Taxation"
-                ]
-            }
-        }
-    }
+    return _compressed_static_json_response(request, _INDUSTRIES_JSON, _INDUSTRIES_COMPRESSED)
 
 
-@app.get("/sample-jobs")
-async def get_sample_job_descriptions():
-    """Returns sample job descriptions for testing the analyzer."""
-    return {
-        "samples": [
-            {
-                "id": "software_engineer",
-                "title": "Senior Software Engineer",
-                "company": "Tech Corp",
-                "description": """We are looking for a Senior Software Engineer to join our team.
+SAMPLE_JOBS = {
+    "samples": [
+        {
+            "id": "software_engineer",
+            "title": "Senior Software Engineer",
+            "company": "Tech Corp",
+            "description": """We are looking for a Senior Software Engineer to join our team.
 
 Requirements:
 - 5+ years of experience in software development
@@ -223,12 +353,12 @@ Nice to have:
 - Experience with machine learning or data engineering
 - Knowledge of TypeScript and Node.js
 - Contributions to open-source projects"""
-            },
-            {
-                "id": "data_analyst",
-                "title": "Data Analyst",
-                "company": "Analytics Inc",
-                "description": """Join our data team as a Data Analyst!
+        },
+        {
+            "id": "data_analyst",
+            "title": "Data Analyst",
+            "company": "Analytics Inc",
+            "description": """Join our data team as a Data Analyst!
 
 Requirements:
 - 3+ years of experience in data analysis
@@ -251,12 +381,12 @@ Nice to have:
 - Experience with Google Analytics
 - Knowledge of machine learning basics
 - Experience with BigQuery or Snowflake"""
-            },
-            {
-                "id": "product_manager",
-                "title": "Product Manager",
-                "company": "Innovation Labs",
-                "description": """We're seeking a Product Manager to drive product strategy.
+        },
+        {
+            "id": "product_manager",
+            "title": "Product Manager",
+            "company": "Innovation Labs",
+            "description": """We're seeking a Product Manager to drive product strategy.
 
 Requirements:
 - 4+ years of product management experience
@@ -279,12 +409,12 @@ Nice to have:
 - Experience in SaaS or B2B products
 - Knowledge of SQL for data analysis
 - Experience with growth and experimentation"""
-            },
-            {
-                "id": "marketing_manager",
-                "title": "Digital Marketing Manager",
-                "company": "Growth Co",
-                "description": """Looking for a Digital Marketing Manager to lead our marketing efforts.
+        },
+        {
+            "id": "marketing_manager",
+            "title": "Digital Marketing Manager",
+            "company": "Growth Co",
+            "description": """Looking for a Digital Marketing Manager to lead our marketing efforts.
 
 Requirements:
 - 5+ years in digital marketing
@@ -307,12 +437,12 @@ Nice to have:
 - Experience with video marketing
 - Knowledge of marketing analytics platforms
 - Brand management experience"""
-            },
-            {
-                "id": "ux_designer",
-                "title": "Senior UX Designer",
-                "company": "Design Studio",
-                "description": """Join us as a Senior UX Designer to create exceptional user experiences.
+        },
+        {
+            "id": "ux_designer",
+            "title": "Senior UX Designer",
+            "company": "Design Studio",
+            "description": """Join us as a Senior UX Designer to create exceptional user experiences.
 
 Requirements:
 - 5+ years of UX/UI design experience
@@ -335,17 +465,85 @@ Nice to have:
 - Experience with motion design and micro-interactions
 - Knowledge of HTML/CSS for design handoff
 - Experience with mobile app design"""
-            }
-        ]
-    }
+        }
+    ]
+}
+_SAMPLE_JOBS_JSON = _encode_static_json(SAMPLE_JOBS)
+_SAMPLE_JOBS_COMPRESSED = _precompress(_SAMPLE_JOBS_JSON)
+
+
+@app.get("/sample-jobs")
+async def get_sample_job_descriptions(request: Request):
+    """Returns sample job descriptions for testing the analyzer."""
+    return _compressed_static_json_response(request, _SAMPLE_JOBS_JSON, _SAMPLE_JOBS_COMPRESSED)
+
+
+def _analysis_cache_key(resume_text: str, job_description: str) -> bytes:
+    """Digest identifying a resume/job description pair."""
+    return hashlib.blake2b(
+        f"{resume_text}\0{job_description}".encode("utf-8"), digest_size=16
+    ).digest()
+
+
+def _finish_analysis(key: bytes, task: asyncio.Task):
+    """Moves a finished analysis from the in-flight table into the result cache."""
+    _analysis_inflight.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        _analysis_cache[key] = task.result()
+
+
+async def _analyze_in_pool(state: State, resume_text: str, job_description: str) -> dict:
+    """
+    Runs generate_full_analysis in the app's worker pool. A worker that dies breaks
+    the whole pool, so it is replaced with a fresh pool and the analysis retried once.
+    """
+    loop = asyncio.get_running_loop()
+    pool = state.analysis_pool
+    try:
+        return await loop.run_in_executor(pool, generate_full_analysis, resume_text, job_description)
+    except BrokenProcessPool:
+        # Concurrent requests may all see the broken pool; only the first replaces it
+        if state.analysis_pool is pool:
+            print("Warning: Analysis worker pool broke; starting a new one")
+            pool.shutdown(wait=False, cancel_futures=True)
+            state.analysis_pool = _create_analysis_pool()
+        return await loop.run_in_executor(
+            state.analysis_pool, generate_full_analysis, resume_text, job_description
+        )
+
+
+async def run_full_analysis(resume_text: str, job_description: str, state: State) -> dict:
+    """
+    Runs generate_full_analysis in the threadpool (or the worker pool when one is
+    configured on the app `state`), reusing cached results for repeated submissions.
+    Concurrent requests for the same pair share one computation.
+    """
+    key = _analysis_cache_key(resume_text, job_description)
+    cached = _analysis_cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = _analysis_inflight.get(key)
+    if task is None:
+        if state.analysis_pool is None:
+            future = run_in_threadpool(generate_full_analysis, resume_text, job_description)
+        else:
+            future = _analyze_in_pool(state, resume_text, job_description)
+        task = asyncio.ensure_future(future)
+        _analysis_inflight[key] = task
+        task.add_done_callback(lambda t: _finish_analysis(key, t))
+    # Shield so one caller disconnecting doesn't cancel the work others are waiting on
+    return await asyncio.shield(task)
 
 
 @app.get("/history")
-async def get_history(limit: int = 10):
+async def get_history(limit: int = Query(10, ge=1, le=100), db: Database = Depends(get_db)):
     """Returns the most recent analyses from MongoDB (most recent first)."""
     try:
-        history = await get_analysis_history(limit=limit)
-        total = await get_total_analyses_count()
+        history, total = await asyncio.gather(
+            get_analysis_history(db, limit=limit),
+            get_total_analyses_count(db),
+        )
         return {
             "history": history,
             "total_analyses": total
@@ -358,10 +556,10 @@ async def get_history(limit: int = 10):
 
 
 @app.get("/history/{analysis_id}")
-async def get_single_analysis(analysis_id: str):
+async def get_single_analysis(analysis_id: str, db: Database = Depends(get_db)):
     """Get a specific analysis by ID."""
     try:
-        analysis = await get_analysis_by_id(analysis_id)
+        analysis = await get_analysis_by_id(db, analysis_id)
         if analysis is None:
             raise HTTPException(
                 status_code=404,
@@ -378,10 +576,10 @@ async def get_single_analysis(analysis_id: str):
 
 
 @app.delete("/history/{analysis_id}")
-async def delete_single_analysis(analysis_id: str):
+async def delete_single_analysis(analysis_id: str, db: Database = Depends(get_db)):
     """Delete a specific analysis by ID."""
     try:
-        success = await delete_analysis(analysis_id)
+        success = await delete_analysis(db, analysis_id)
         if not success:
             raise HTTPException(
                 status_code=404,
@@ -398,10 +596,10 @@ async def delete_single_analysis(analysis_id: str):
 
 
 @app.delete("/history")
-async def clear_history():
+async def clear_history(db: Database = Depends(get_db)):
     """Clears all analysis history from MongoDB."""
     try:
-        deleted_count = await clear_all_history()
+        deleted_count = await clear_all_history(db)
         return {
             "message": "History cleared successfully",
             "deleted_count": deleted_count
@@ -414,10 +612,10 @@ async def clear_history():
 
 
 @app.get("/stats")
-async def get_stats():
+async def get_stats(db: Database = Depends(get_db)):
     """Get statistics about all analyses."""
     try:
-        stats = await get_analyses_stats()
+        stats = await get_analyses_stats(db)
         return stats
     except Exception as e:
         raise HTTPException(
@@ -428,8 +626,10 @@ async def get_stats():
 
 @app.post("/analyze")
 async def analyze_resume(
+    request: Request,
     resume: UploadFile = File(...),
     job_description: str = Form(...),
+    db: Optional[Database] = Depends(get_optional_db),
 ):
     """
     Performs comprehensive resume analysis against a job description.
@@ -449,15 +649,31 @@ async def analyze_resume(
             detail="Job description cannot be empty.",
         )
 
-    # Read file content
-    file_bytes = await resume.read()
+    if resume.size is not None and resume.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {MAX_UPLOAD_SIZE // (1024 * 1024)} MB.",
+        )
+
+    # The upload is already spooled to a temporary file (on disk past 1 MB);
+    # parse it in place instead of reading the whole file into memory
+    upload = resume.file
+    await resume.seek(0)
+    signature = await resume.read(4)
+    await resume.seek(0)
+
+    # Reject uploads whose content doesn't match their extension before parsing
+    resume_format = RESUME_FORMATS.get(signature)
+    if resume_format is None or not filename.endswith(resume_format[0]):
+        raise HTTPException(
+            status_code=400,
+            detail="File content does not match its type. Please upload a valid PDF or DOCX file.",
+        )
+    _, extract_text = resume_format
 
     # Extract text based on file type
     try:
-        if filename.endswith(".pdf"):
-            resume_text = extract_text_from_pdf(file_bytes)
-        else:
-            resume_text = extract_text_from_docx(file_bytes)
+        resume_text = await run_in_threadpool(extract_text, upload)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -470,46 +686,55 @@ async def analyze_resume(
             detail="Could not extract text from the resume. The file might be image-based or corrupted.",
         )
 
-    # Generate comprehensive analysis
+    # Generate comprehensive analysis (CPU-bound, keep it off the event loop)
     try:
-        analysis = generate_full_analysis(resume_text, job_description)
+        analysis = await run_full_analysis(resume_text, job_description, request.app.state)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error analyzing resume: {str(e)}",
         )
 
-    # Prepare response
+    # Prepare response; one timestamp is shared by the response and the stored entry
+    analyzed_at = datetime.now(timezone.utc)
     result = {
         "filename": resume.filename,
-        "analyzed_at": datetime.now().isoformat(),
+        "analyzed_at": analyzed_at,
         **analysis
     }
 
-    # Store in MongoDB
+    # Store in MongoDB; awaited so the frontend's history refresh right after
+    # this response already includes the new entry
     try:
+        if db is None:
+            raise Exception("Database not connected")
+        # Counts come precomputed from the analysis instead of re-measuring the keyword lists
+        match_stats = analysis["keyword_match_stats"]
         history_entry = {
             "filename": resume.filename,
-            "analyzed_at": result["analyzed_at"],
+            "analyzed_at": analyzed_at,
+            "created_at": analyzed_at,
             "overall_score": analysis["overall_score"],
             "ats_score": analysis["ats_score"],
-            "section_score": analysis.get("section_score", 0),
-            "formatting_score": analysis.get("formatting_score", 0),
-            "content_similarity_score": analysis.get("content_similarity_score", 0),
-            "matched_keywords_count": len(analysis.get("matched_keywords", [])),
-            "missing_keywords_count": len(analysis.get("missing_keywords", [])),
+            "section_score": analysis["section_score"],
+            "formatting_score": analysis["formatting_score"],
+            "content_similarity_score": analysis["content_similarity_score"],
+            "matched_keywords_count": match_stats["matched_count"],
+            "missing_keywords_count": match_stats["missing_count"],
         }
-        doc_id = await save_analysis(history_entry)
+        doc_id = await save_analysis(db, history_entry)
         result["_id"] = doc_id
     except Exception as e:
         # Log error but don't fail the request
         print(f"Warning: Failed to save analysis to database: {e}")
 
-    return result
+    # Returned directly so orjson serializes the report without a jsonable_encoder pass
+    return ORJSONResponse(result)
 
 
 @app.post("/quick-score")
 async def quick_score(
+    request: Request,
     resume_text: str = Form(...),
     job_description: str = Form(...),
 ):
@@ -529,10 +754,10 @@ async def quick_score(
             detail="Job description cannot be empty.",
         )
 
-    analysis = generate_full_analysis(resume_text, job_description)
+    analysis = await run_full_analysis(resume_text, job_description, request.app.state)
     
-    return {
+    return ORJSONResponse({
         "source": "text_input",
-        "analyzed_at": datetime.now().isoformat(),
+        "analyzed_at": datetime.now(timezone.utc),
         **analysis
-    }
+    })
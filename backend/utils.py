@@ -1,15 +1,24 @@
 """
 Advanced Utility functions for resume parsing and ATS scoring.
 """
+import heapq
 import re
+import threading
 from io import BytesIO
-from collections import Counter
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import cache, lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import BinaryIO, Optional, Union
+import ahocorasick
+import pypdfium2 as pdfium
 from pdfminer.high_level import extract_text as extract_pdf_text
 from docx import Document
 
 
 # ===== Common skill categories =====
-TECHNICAL_SKILLS = {
+TECHNICAL_SKILLS = frozenset({
     'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue', 'nodejs',
     'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'docker', 'kubernetes', 'aws',
     'azure', 'gcp', 'linux', 'git', 'jenkins', 'terraform', 'ansible', 'html', 'css',
@@ -17,61 +26,302 @@ TECHNICAL_SKILLS = {
     'pytorch', 'pandas', 'numpy', 'scikit', 'spark', 'hadoop', 'kafka', 'elasticsearch',
     'c++', 'golang', 'rust', 'swift', 'kotlin', 'flutter', 'react native', 'django',
     'flask', 'spring', 'nodejs', 'express', 'fastapi', 'devops', 'cicd', 'agile', 'scrum'
-}
+})
 
-SOFT_SKILLS = {
+SOFT_SKILLS = frozenset({
     'communication', 'leadership', 'teamwork', 'problem solving', 'analytical',
     'critical thinking', 'creativity', 'adaptability', 'collaboration', 'management',
     'mentoring', 'presentation', 'negotiation', 'decision making', 'time management',
     'organization', 'attention to detail', 'multitasking', 'interpersonal', 'strategic'
-}
+})
 
-TOOLS_PLATFORMS = {
+TOOLS_PLATFORMS = frozenset({
     'jira', 'confluence', 'slack', 'trello', 'asana', 'github', 'gitlab', 'bitbucket',
     'figma', 'sketch', 'adobe', 'photoshop', 'illustrator', 'excel', 'powerpoint',
     'tableau', 'power bi', 'salesforce', 'hubspot', 'zendesk', 'notion', 'monday',
     'postman', 'swagger', 'vs code', 'intellij', 'pycharm', 'android studio', 'xcode'
-}
+})
 
-CERTIFICATIONS_KEYWORDS = {
+CERTIFICATIONS_KEYWORDS = frozenset({
     'certified', 'certification', 'certificate', 'aws certified', 'azure certified',
     'pmp', 'scrum master', 'csm', 'cka', 'ckad', 'comptia', 'cisco', 'ccna', 'ccnp',
     'google certified', 'meta certified', 'six sigma', 'itil', 'prince2'
+})
+
+# ===== Standard resume sections: (name, detection keywords, importance) =====
+RESUME_SECTIONS = (
+    ('contact_info', ('email', 'phone', 'linkedin', 'github', 'address', '@'), 'critical'),
+    ('summary', ('summary', 'objective', 'profile', 'about me'), 'recommended'),
+    ('experience', ('experience', 'work history', 'employment', 'professional experience'), 'critical'),
+    ('education', ('education', 'academic', 'degree', 'university', 'college', 'bachelor', 'master', 'phd'), 'critical'),
+    ('skills', ('skills', 'technical skills', 'competencies', 'technologies'), 'critical'),
+    ('projects', ('project', 'portfolio', 'personal project', 'team project'), 'recommended'),
+    ('certifications', ('certification', 'certificate', 'licensed', 'accredited'), 'optional'),
+    ('achievements', ('achievement', 'award', 'honor', 'recognition', 'accomplishment'), 'optional'),
+)
+
+# Parallel per-section columns read by detect_resume_sections
+_SECTION_NAMES = tuple(name for name, _, _ in RESUME_SECTIONS)
+_SECTION_TAGS = tuple(('section', name) for name in _SECTION_NAMES)
+_SECTION_IMPORTANCE = tuple(importance for _, _, importance in RESUME_SECTIONS)
+_CRITICAL_SECTION_COUNT = _SECTION_IMPORTANCE.count('critical')
+
+# Verbs counted by the formatting check
+ACTION_VERBS = (
+    'achieved', 'improved', 'created', 'developed', 'led', 'managed',
+    'increased', 'reduced', 'designed', 'implemented', 'launched',
+    'built', 'optimized', 'streamlined', 'delivered', 'executed'
+)
+
+# Results-oriented verbs whose absence triggers a content suggestion
+IMPACT_VERBS = ('achieved', 'improved', 'increased', 'reduced', 'delivered')
+
+# Formatting issue type -> (suggestion priority, suggestion title); other types are not suggested
+FORMATTING_ISSUE_SUGGESTIONS = {
+    'error': ('high', 'Formatting Issue'),
+    'warning': ('medium', 'Improvement Suggestion'),
 }
 
+# Filler words excluded from the top JD keywords
+COMMON_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
+    'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'to', 'for', 'of', 'in', 'on', 'at', 'by', 'with', 'from', 'as',
+    'this', 'that', 'these', 'those', 'it', 'its', 'they', 'their',
+    'we', 'our', 'you', 'your', 'he', 'she', 'him', 'her', 'his',
+    'who', 'what', 'when', 'where', 'why', 'how', 'which', 'all',
+    'each', 'every', 'both', 'few', 'more', 'most', 'other', 'some',
+    'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than',
+    'too', 'very', 'just', 'also', 'now', 'well', 'about', 'after',
+    'before', 'between', 'into', 'through', 'during', 'above', 'below'
+})
+
+# Patterns used by the formatting checks
+_NUM_RE = re.compile(r'\d+%?')
+_FP_RE = re.compile(r'\b(?:i am|i have|i was)\b')
+_EMAIL_RE = re.compile(r'[\w.-]+@[\w.-]+\.\w+')
+_PHONE_RE = re.compile(r'[\d()\-+\s]{10,}')
+
+
+@cache
+def _keyword_automaton() -> ahocorasick.Automaton:
+    """
+    Builds (on first use) one Aho-Corasick automaton over every fixed section
+    keyword and verb. Each keyword maps to the (kind, name) tags it contributes when found.
+    """
+    tags_by_keyword = defaultdict(list)
+    for section_name, keywords, _ in RESUME_SECTIONS:
+        for keyword in keywords:
+            tags_by_keyword[keyword].append(('section', section_name))
+    for verb in ACTION_VERBS:
+        tags_by_keyword[verb].append(('action_verb', verb))
+    for verb in IMPACT_VERBS:
+        tags_by_keyword[verb].append(('impact_verb', verb))
+
+    automaton = ahocorasick.Automaton()
+    for keyword, tags in tags_by_keyword.items():
+        automaton.add_word(keyword, tuple(tags))
+    automaton.make_automaton()
+    return automaton
+
+
+@cache
+def _certification_automaton() -> ahocorasick.Automaton:
+    """Builds (on first use) an Aho-Corasick automaton over the certification keywords."""
+    automaton = ahocorasick.Automaton()
+    for cert in CERTIFICATIONS_KEYWORDS:
+        automaton.add_word(cert, cert)
+    automaton.make_automaton()
+    return automaton
+
+
+def _as_binary_stream(source: Union[bytes, BinaryIO]) -> BinaryIO:
+    """Wraps raw bytes in a stream; file-like objects are used as-is."""
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    return source
+
+
+# PDFium is not thread-safe and extraction runs on the threadpool
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _extract_text_with_pdfium(stream: BinaryIO) -> str:
+    """Extracts PDF text with PDFium, releasing native page objects as it goes."""
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(stream)
+        try:
+            page_texts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    page_texts.append(textpage.get_text_range())
+                finally:
+                    textpage.close()
+                    page.close()
+            return "\n".join(page_texts)
+        finally:
+            pdf.close()
+
+
+def extract_text_from_pdf(source: Union[bytes, BinaryIO]) -> str:
+    """
+    Extracts text content from a PDF file (raw bytes or a seekable binary file).
+    Uses PDFium, falling back to pdfminer for files PDFium cannot parse.
+    """
+    stream = _as_binary_stream(source)
+    try:
+        return _extract_text_with_pdfium(stream)
+    except pdfium.PdfiumError:
+        stream.seek(0)
+        return extract_pdf_text(stream)
+
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    """Extracts text content from a PDF file."""
-    return extract_pdf_text(BytesIO(file_bytes))
+def extract_text_from_docx(source: Union[bytes, BinaryIO]) -> str:
+    """
+    Extracts text content from a DOCX file (raw bytes or a seekable binary file).
+    Empty paragraphs are skipped; they only add blank lines.
+    """
+    doc = Document(_as_binary_stream(source))
+    return "\n".join(text for text in (para.text for para in doc.paragraphs) if text)
 
 
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    """Extracts text content from a DOCX file."""
-    doc = Document(BytesIO(file_bytes))
-    return "\n".join([para.text for para in doc.paragraphs])
+# bytes.translate table for clean_text: keeps [a-z0-9+#.], lowercases A-Z and
+# turns every other byte into a space
+_CLEAN_TEXT_ALLOWED = b'abcdefghijklmnopqrstuvwxyz0123456789+#.'
+_CLEAN_TEXT_TABLE = bytes(
+    c if c in _CLEAN_TEXT_ALLOWED else (c + 32 if 65 <= c <= 90 else 32) for c in range(256)
+)
 
 
+@lru_cache(maxsize=16)
 def clean_text(text: str) -> str:
-    """Cleans and normalizes text for processing."""
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s\+\#\.]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    """
+    Cleans and normalizes text for processing.
+    Cached because every scorer cleans the same resume and job description.
+    """
+    # Non-ASCII characters are never kept, so encoding replaces each with '?'
+    # (a space after translation) and the table pass runs over plain bytes
+    ascii_bytes = text.lower().encode('ascii', 'replace')
+    return b" ".join(ascii_bytes.translate(_CLEAN_TEXT_TABLE).split()).decode('ascii')
+
+
+def _tokens(text: str) -> list:
+    """Cleans text and splits it into word tokens."""
+    return clean_text(text).split()
+
+
+def _keywords_from_words(words, min_length: int = 2) -> set:
+    """Unique keywords from an already-cleaned token list."""
+    return {word for word in words if len(word) >= min_length}
+
+
+def _phrases_from_words(words) -> set:
+    """Two-word phrases from an already-cleaned token list."""
+    # zip/map keep the pairing and joining loop inside the interpreter's C code
+    return set(map(" ".join, zip(words, words[1:])))
+
+
+def _phrase_pairs_from_words(words) -> set:
+    """
+    Two-word phrases in an already-cleaned token list, as (word, word) pairs.
+    Matching only needs equality, so no phrase string is built per word pair.
+    """
+    return set(zip(words, words[1:]))
 
 
 def get_keywords(text: str, min_length: int = 2) -> set:
     """Extracts unique keywords from text."""
-    words = clean_text(text).split()
-    return {word for word in words if len(word) >= min_length}
+    return _keywords_from_words(_tokens(text), min_length)
 
 
 def extract_phrases(text: str) -> set:
     """Extracts two-word phrases for better matching."""
-    words = clean_text(text).split()
-    phrases = set()
-    for i in range(len(words) - 1):
-        phrases.add(f"{words[i]} {words[i+1]}")
-    return phrases
+    return _phrases_from_words(_tokens(text))
+
+
+def get_top_jd_keywords(jd_words: list) -> list:
+    """Returns the most frequent meaningful JD words as (word, count) pairs."""
+    # Count meaningful words only, skipping common words and short tokens inline
+    jd_word_freq = defaultdict(int)
+    for word in jd_words:
+        if len(word) > 2 and word not in COMMON_WORDS:
+            jd_word_freq[word] += 1
+    
+    important_jd_keywords = [(word, count) for word, count in jd_word_freq.items() if count > 1]
+    return heapq.nlargest(15, important_jd_keywords, key=itemgetter(1))
+
+
+@dataclass(frozen=True)
+class JDFeatures:
+    """Job-description-side data shared by every analysis against the same posting."""
+    text: str
+    lower: str
+    words: tuple
+    keywords: frozenset
+    # (word, word) pair -> phrase text, for matching by pair and reporting by text
+    phrases: dict = field(compare=False)
+    top_keywords: tuple
+    # Occurrences of each keyword in the raw lowercased JD, as str.count would report
+    keyword_counts: dict = field(compare=False)
+
+
+def _count_substrings(text: str, patterns) -> dict:
+    """
+    Counts non-overlapping occurrences of each pattern in text, matching
+    str.count, with a single Aho-Corasick scan instead of one scan per pattern.
+    """
+    counts = dict.fromkeys(patterns, 0)
+    if not counts:
+        return counts
+    automaton = ahocorasick.Automaton()
+    for pattern in counts:
+        automaton.add_word(pattern, pattern)
+    automaton.make_automaton()
+    
+    # Matches of one pattern arrive in order of end position, so skipping any that
+    # overlap the previous counted match reproduces str.count's leftmost counting
+    next_start = {}
+    for end, pattern in automaton.iter(text):
+        start = end - len(pattern) + 1
+        if start >= next_start.get(pattern, 0):
+            counts[pattern] += 1
+            next_start[pattern] = end + 1
+    return counts
+
+
+@lru_cache(maxsize=128)
+def preprocess_job_description(jd_text: str) -> JDFeatures:
+    """
+    Tokenizes a job description once; results are cached per JD text so
+    repeated analyses against the same posting skip the JD-side work.
+    """
+    words = tuple(_tokens(jd_text))
+    lower = jd_text.lower()
+    keywords = frozenset(_keywords_from_words(words))
+    return JDFeatures(
+        text=jd_text,
+        lower=lower,
+        words=words,
+        keywords=keywords,
+        phrases={pair: " ".join(pair) for pair in zip(words, words[1:])},
+        top_keywords=tuple(get_top_jd_keywords(words)),
+        keyword_counts=_count_substrings(lower, keywords),
+    )
+
+
+@lru_cache(maxsize=16)
+def _keyword_hits(text_lower: str) -> frozenset:
+    """
+    Tags of every fixed keyword occurring as a substring of the lowercased text,
+    found in a single linear scan. Cached so the section, formatting and
+    suggestion checks share one scan of the same resume.
+    """
+    hits = set()
+    for _, tags in _keyword_automaton().iter(text_lower):
+        hits.update(tags)
+    return frozenset(hits)
 
 
 def categorize_skills(keywords: set) -> dict:
@@ -84,6 +334,7 @@ def categorize_skills(keywords: set) -> dict:
         'other': []
     }
     
+    cert_automaton = _certification_automaton()
     for keyword in keywords:
         kw_lower = keyword.lower()
         if kw_lower in TECHNICAL_SKILLS:
@@ -92,7 +343,7 @@ def categorize_skills(keywords: set) -> dict:
             categories['soft_skills'].append(keyword)
         elif kw_lower in TOOLS_PLATFORMS:
             categories['tools'].append(keyword)
-        elif any(cert in kw_lower for cert in CERTIFICATIONS_KEYWORDS):
+        elif next(cert_automaton.iter(kw_lower), None) is not None:
             categories['certifications'].append(keyword)
         else:
             categories['other'].append(keyword)
@@ -100,73 +351,36 @@ def categorize_skills(keywords: set) -> dict:
     return categories
 
 
-def detect_resume_sections(resume_text: str) -> dict:
-    """Detects and scores the presence of standard resume sections."""
-    resume_lower = resume_text.lower()
-    
-    sections = {
-        'contact_info': {
-            'present': False,
-            'keywords': ['email', 'phone', 'linkedin', 'github', 'address', '@'],
-            'importance': 'critical'
-        },
-        'summary': {
-            'present': False,
-            'keywords': ['summary', 'objective', 'profile', 'about me'],
-            'importance': 'recommended'
-        },
-        'experience': {
-            'present': False,
-            'keywords': ['experience', 'work history', 'employment', 'professional experience'],
-            'importance': 'critical'
-        },
-        'education': {
-            'present': False,
-            'keywords': ['education', 'academic', 'degree', 'university', 'college', 'bachelor', 'master', 'phd'],
-            'importance': 'critical'
-        },
-        'skills': {
-            'present': False,
-            'keywords': ['skills', 'technical skills', 'competencies', 'technologies'],
-            'importance': 'critical'
-        },
-        'projects': {
-            'present': False,
-            'keywords': ['project', 'portfolio', 'personal project', 'team project'],
-            'importance': 'recommended'
-        },
-        'certifications': {
-            'present': False,
-            'keywords': ['certification', 'certificate', 'licensed', 'accredited'],
-            'importance': 'optional'
-        },
-        'achievements': {
-            'present': False,
-            'keywords': ['achievement', 'award', 'honor', 'recognition', 'accomplishment'],
-            'importance': 'optional'
-        }
-    }
-    
-    for section_name, section_data in sections.items():
-        for keyword in section_data['keywords']:
-            if keyword in resume_lower:
-                section_data['present'] = True
-                break
+def detect_resume_sections(resume_text: str, resume_lower: Optional[str] = None) -> dict:
+    """
+    Detects and scores the presence of standard resume sections.
+    `resume_lower` may carry the already-lowercased resume text.
+    """
+    if resume_lower is None:
+        resume_lower = resume_text.lower()
+    hits = _keyword_hits(resume_lower)
+    present = [tag in hits for tag in _SECTION_TAGS]
     
     # Calculate section score
-    critical_present = sum(1 for s in sections.values() if s['present'] and s['importance'] == 'critical')
-    critical_total = sum(1 for s in sections.values() if s['importance'] == 'critical')
+    critical_present = sum(1 for is_present, importance in zip(present, _SECTION_IMPORTANCE)
+                           if is_present and importance == 'critical')
     
-    section_score = round((critical_present / critical_total) * 100) if critical_total > 0 else 0
+    section_score = round((critical_present / _CRITICAL_SECTION_COUNT) * 100) if _CRITICAL_SECTION_COUNT > 0 else 0
     
     return {
-        'sections': {k: {'present': v['present'], 'importance': v['importance']} for k, v in sections.items()},
+        'sections': {
+            name: {'present': is_present, 'importance': importance}
+            for name, is_present, importance in zip(_SECTION_NAMES, present, _SECTION_IMPORTANCE)
+        },
         'section_score': section_score
     }
 
 
-def analyze_formatting(resume_text: str) -> dict:
-    """Analyzes resume formatting and structure quality."""
+def analyze_formatting(resume_text: str, resume_lower: Optional[str] = None) -> dict:
+    """
+    Analyzes resume formatting and structure quality.
+    `resume_lower` may carry the already-lowercased resume text.
+    """
     issues = []
     score = 100
     
@@ -180,11 +394,9 @@ def analyze_formatting(resume_text: str) -> dict:
         score -= 10
     
     # Check for action verbs
-    action_verbs = ['achieved', 'improved', 'created', 'developed', 'led', 'managed', 
-                    'increased', 'reduced', 'designed', 'implemented', 'launched', 
-                    'built', 'optimized', 'streamlined', 'delivered', 'executed']
-    resume_lower = resume_text.lower()
-    verbs_found = sum(1 for verb in action_verbs if verb in resume_lower)
+    if resume_lower is None:
+        resume_lower = resume_text.lower()
+    verbs_found = sum(1 for kind, _ in _keyword_hits(resume_lower) if kind == 'action_verb')
     
     if verbs_found < 3:
         issues.append({'type': 'warning', 'message': 'Use more action verbs to describe your achievements.'})
@@ -192,12 +404,12 @@ def analyze_formatting(resume_text: str) -> dict:
     elif verbs_found >= 5:
         issues.append({'type': 'success', 'message': 'Good use of action verbs!'})
     
-    # Check for metrics/numbers
-    numbers = re.findall(r'\d+%?', resume_text)
-    if len(numbers) < 3:
+    # Check for metrics/numbers; only counts up to 5 matter, so stop scanning there
+    number_count = sum(1 for _ in islice(_NUM_RE.finditer(resume_text), 5))
+    if number_count < 3:
         issues.append({'type': 'warning', 'message': 'Add more quantifiable achievements with numbers.'})
         score -= 10
-    elif len(numbers) >= 5:
+    elif number_count >= 5:
         issues.append({'type': 'success', 'message': 'Good use of quantifiable metrics!'})
     
     # Check for common resume issues
@@ -205,19 +417,19 @@ def analyze_formatting(resume_text: str) -> dict:
         issues.append({'type': 'error', 'message': 'Remove "References available upon request" - it\'s outdated.'})
         score -= 5
     
-    if re.search(r'\b(i am|i have|i was)\b', resume_lower):
+    if _FP_RE.search(resume_lower):
         issues.append({'type': 'warning', 'message': 'Avoid first-person pronouns. Use action verbs instead.'})
         score -= 5
     
     # Check for email
-    if not re.search(r'[\w\.-]+@[\w\.-]+\.\w+', resume_text):
+    if not _EMAIL_RE.search(resume_text):
         issues.append({'type': 'error', 'message': 'No email address detected. Ensure contact info is included.'})
         score -= 15
     else:
         issues.append({'type': 'success', 'message': 'Contact email detected.'})
     
     # Check for phone
-    if not re.search(r'[\d\(\)\-\+\s]{10,}', resume_text):
+    if not _PHONE_RE.search(resume_text):
         issues.append({'type': 'warning', 'message': 'Phone number may be missing or not detected.'})
         score -= 5
     
@@ -228,35 +440,30 @@ def analyze_formatting(resume_text: str) -> dict:
     }
 
 
-def calculate_keyword_density(resume_text: str, jd_text: str) -> dict:
-    """Calculates keyword frequency and density analysis."""
-    resume_words = clean_text(resume_text).split()
-    jd_words = clean_text(jd_text).split()
-    
-    jd_word_freq = Counter(jd_words)
-    resume_word_freq = Counter(resume_words)
-    
-    # Get top JD keywords (excluding common words)
-    common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 
-                   'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
-                   'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
-                   'to', 'for', 'of', 'in', 'on', 'at', 'by', 'with', 'from', 'as',
-                   'this', 'that', 'these', 'those', 'it', 'its', 'they', 'their',
-                   'we', 'our', 'you', 'your', 'he', 'she', 'him', 'her', 'his',
-                   'who', 'what', 'when', 'where', 'why', 'how', 'which', 'all',
-                   'each', 'every', 'both', 'few', 'more', 'most', 'other', 'some',
-                   'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than',
-                   'too', 'very', 'just', 'also', 'now', 'well', 'about', 'after',
-                   'before', 'between', 'into', 'through', 'during', 'above', 'below'}
+def calculate_keyword_density(resume_text: str, jd_text: str,
+                              jd_features: Optional[JDFeatures] = None,
+                              resume_words: Optional[list] = None) -> dict:
+    """
+    Calculates keyword frequency and density analysis.
+    `resume_words` may carry the already-cleaned resume tokens.
+    """
+    if resume_words is None:
+        resume_words = _tokens(resume_text)
+    if jd_features is None:
+        jd_features = preprocess_job_description(jd_text)
+    jd_words = jd_features.words
     
-    important_jd_keywords = {word: count for word, count in jd_word_freq.items() 
-                            if word not in common_words and len(word) > 2 and count > 1}
+    top_keywords = jd_features.top_keywords
     
-    top_keywords = sorted(important_jd_keywords.items(), key=lambda x: x[1], reverse=True)[:15]
+    # Count only the top JD keywords instead of every resume word
+    resume_word_freq = dict.fromkeys((keyword for keyword, _ in top_keywords), 0)
+    for word in resume_words:
+        if word in resume_word_freq:
+            resume_word_freq[word] += 1
     
     keyword_analysis = []
     for keyword, jd_count in top_keywords:
-        resume_count = resume_word_freq.get(keyword, 0)
+        resume_count = resume_word_freq[keyword]
         keyword_analysis.append({
             'keyword': keyword,
             'jd_frequency': jd_count,
@@ -272,17 +479,27 @@ def calculate_keyword_density(resume_text: str, jd_text: str) -> dict:
     }
 
 
-def calculate_ats_score(resume_text: str, jd_text: str) -> dict:
+def calculate_ats_score(resume_text: str, jd_text: str,
+                        jd_features: Optional[JDFeatures] = None,
+                        resume_keywords: Optional[set] = None,
+                        resume_phrase_pairs: Optional[set] = None) -> dict:
     """
     Calculates a comprehensive ATS match score between a resume and job description.
     Uses keyword matching, phrase matching, and multiple analysis factors.
+    Precomputed resume keywords and phrase pairs may be passed to skip re-tokenizing.
     """
-    resume_keywords = get_keywords(resume_text)
-    jd_keywords = get_keywords(jd_text)
-    
-    # Also check two-word phrases
-    resume_phrases = extract_phrases(resume_text)
-    jd_phrases = extract_phrases(jd_text)
+    if jd_features is None:
+        jd_features = preprocess_job_description(jd_text)
+    
+    # Keywords and two-word phrases both come from one token list
+    if resume_keywords is None or resume_phrase_pairs is None:
+        resume_words = _tokens(resume_text)
+        if resume_keywords is None:
+            resume_keywords = _keywords_from_words(resume_words)
+        if resume_phrase_pairs is None:
+            resume_phrase_pairs = _phrase_pairs_from_words(resume_words)
+    jd_keywords = jd_features.keywords
+    jd_phrases = jd_features.phrases
     
     if not jd_keywords:
         return {"score": 0, "matched_keywords": [], "missing_keywords": [], 
@@ -293,7 +510,7 @@ def calculate_ats_score(resume_text: str, jd_text: str) -> dict:
     missing_keywords = jd_keywords.difference(resume_keywords)
     
     # Phrase matching
-    matched_phrases = resume_phrases.intersection(jd_phrases)
+    matched_phrases = [jd_phrases[pair] for pair in resume_phrase_pairs.intersection(jd_phrases)]
     
     # Keyword match percentage
     keyword_score = (len(matched_keywords) / len(jd_keywords)) * 100 if jd_keywords else 0
@@ -301,9 +518,9 @@ def calculate_ats_score(resume_text: str, jd_text: str) -> dict:
     # Phrase match score (bonus)
     phrase_score = min(20, len(matched_phrases) * 2)  # Max 20 bonus points
     
-    # Jaccard similarity
-    union = resume_keywords.union(jd_keywords)
-    jaccard_similarity = (len(matched_keywords) / len(union)) * 100 if union else 0
+    # Jaccard similarity; |union| follows from the set sizes without building the union
+    union_size = len(resume_keywords) + len(jd_keywords) - len(matched_keywords)
+    jaccard_similarity = (len(matched_keywords) / union_size) * 100 if union_size else 0
     
     # Combined score (weighted average with phrase bonus)
     base_score = (keyword_score * 0.6) + (jaccard_similarity * 0.3) + (phrase_score * 0.5)
@@ -317,19 +534,25 @@ def calculate_ats_score(resume_text: str, jd_text: str) -> dict:
         "keyword_score": round(keyword_score, 1),
         "similarity_score": round(jaccard_similarity, 1),
         "phrase_score": round(phrase_score, 1),
-        "matched_keywords": sorted(list(matched_keywords))[:50],
-        "missing_keywords": sorted(list(missing_keywords))[:30],
-        "matched_phrases": sorted(list(matched_phrases))[:20],
+        "matched_keywords": heapq.nsmallest(50, matched_keywords),
+        "missing_keywords": heapq.nsmallest(30, missing_keywords),
+        "matched_phrases": heapq.nsmallest(20, matched_phrases),
         "skill_categories": skill_categories
     }
 
 
 def generate_suggestions(resume_text: str, jd_text: str, missing_keywords: list, 
-                         formatting_analysis: dict, section_analysis: dict) -> list:
-    """Generates comprehensive improvement suggestions based on all analyses."""
+                         formatting_analysis: dict, section_analysis: dict,
+                         jd_features: Optional[JDFeatures] = None,
+                         resume_lower: Optional[str] = None) -> list:
+    """
+    Generates comprehensive improvement suggestions based on all analyses.
+    `resume_lower` may carry the already-lowercased resume text.
+    """
     suggestions = []
     
-    resume_lower = resume_text.lower()
+    if resume_lower is None:
+        resume_lower = resume_text.lower()
     
     # Priority 1: Critical missing sections
     for section_name, section_info in section_analysis['sections'].items():
@@ -343,9 +566,13 @@ def generate_suggestions(resume_text: str, jd_text: str, missing_keywords: list,
             })
     
     # Priority 2: Important missing keywords
-    jd_lower = jd_text.lower()
-    keyword_freq = {kw: jd_lower.count(kw) for kw in missing_keywords}
-    important_missing = sorted(keyword_freq.items(), key=lambda x: x[1], reverse=True)[:8]
+    # Missing keywords come from the JD, so their counts are normally precomputed
+    if jd_features is None:
+        jd_features = preprocess_job_description(jd_text)
+    jd_counts = jd_features.keyword_counts
+    keyword_freq = {kw: jd_counts[kw] if kw in jd_counts else jd_features.lower.count(kw)
+                    for kw in missing_keywords}
+    important_missing = heapq.nlargest(8, keyword_freq.items(), key=itemgetter(1))
     
     if important_missing:
         kw_list = ", ".join([kw for kw, _ in important_missing[:5]])
@@ -357,24 +584,19 @@ def generate_suggestions(resume_text: str, jd_text: str, missing_keywords: list,
         })
     
     # Priority 3: Formatting issues
-    for issue in formatting_analysis.get('issues', []):
-        if issue['type'] == 'error':
-            suggestions.append({
-                'priority': 'high',
-                'category': 'formatting',
-                'title': 'Formatting Issue',
-                'description': issue['message']
-            })
-        elif issue['type'] == 'warning':
-            suggestions.append({
-                'priority': 'medium',
-                'category': 'formatting',
-                'title': 'Improvement Suggestion',
-                'description': issue['message']
-            })
+    suggestions.extend(
+        {
+            'priority': FORMATTING_ISSUE_SUGGESTIONS[issue['type']][0],
+            'category': 'formatting',
+            'title': FORMATTING_ISSUE_SUGGESTIONS[issue['type']][1],
+            'description': issue['message']
+        }
+        for issue in formatting_analysis.get('issues', [])
+        if issue['type'] in FORMATTING_ISSUE_SUGGESTIONS
+    )
     
     # Priority 4: Content enhancements
-    if not any(word in resume_lower for word in ['achieved', 'improved', 'increased', 'reduced', 'delivered']):
+    if not any(kind == 'impact_verb' for kind, _ in _keyword_hits(resume_lower)):
         suggestions.append({
             'priority': 'medium',
             'category': 'content',
@@ -405,21 +627,39 @@ def generate_suggestions(resume_text: str, jd_text: str, missing_keywords: list,
     return suggestions
 
 
-def generate_full_analysis(resume_text: str, jd_text: str) -> dict:
-    """Generates a comprehensive resume analysis report."""
+def generate_full_analysis(resume_text: str, jd: Union[str, JDFeatures]) -> dict:
+    """
+    Generates a comprehensive resume analysis report.
+    `jd` is the raw job description or its preprocessed JDFeatures.
+    """
+    jd_features = jd if isinstance(jd, JDFeatures) else preprocess_job_description(jd)
+    jd_text = jd_features.text
+    
+    # Lowercase and tokenize the resume once and share the results with every scorer
+    resume_lower = resume_text.lower()
+    resume_words = _tokens(resume_text)
     
     # Calculate all scores
-    ats_data = calculate_ats_score(resume_text, jd_text)
-    section_analysis = detect_resume_sections(resume_text)
-    formatting_analysis = analyze_formatting(resume_text)
-    keyword_density = calculate_keyword_density(resume_text, jd_text)
+    ats_data = calculate_ats_score(
+        resume_text, jd_text,
+        jd_features=jd_features,
+        resume_keywords=_keywords_from_words(resume_words),
+        resume_phrase_pairs=_phrase_pairs_from_words(resume_words)
+    )
+    section_analysis = detect_resume_sections(resume_text, resume_lower=resume_lower)
+    formatting_analysis = analyze_formatting(resume_text, resume_lower=resume_lower)
+    keyword_density = calculate_keyword_density(
+        resume_text, jd_text, jd_features=jd_features, resume_words=resume_words
+    )
     
     # Generate suggestions
     suggestions = generate_suggestions(
         resume_text, jd_text, 
         ats_data['missing_keywords'],
         formatting_analysis,
-        section_analysis
+        section_analysis,
+        jd_features=jd_features,
+        resume_lower=resume_lower
     )
     
     # Calculate overall score (weighted)
@@ -435,17 +675,18 @@ def generate_full_analysis(resume_text: str, jd_text: str) -> dict:
         resume_preview += "..."
     
     # Generate top priority actions (top 3 actionable items)
-    high_priority = [s for s in suggestions if s['priority'] == 'high'][:2]
-    medium_priority = [s for s in suggestions if s['priority'] == 'medium'][:1]
-    top_priority_actions = high_priority + medium_priority
+    suggestions_by_priority = defaultdict(list)
+    for suggestion in suggestions:
+        suggestions_by_priority[suggestion['priority']].append(suggestion)
+    top_priority_actions = suggestions_by_priority['high'][:2] + suggestions_by_priority['medium'][:1]
     
     # Add keyword match counts for visualization
     keyword_match_stats = {
-        'total_jd_keywords': len(get_keywords(jd_text)),
+        'total_jd_keywords': len(jd_features.keywords),
         'matched_count': len(ats_data['matched_keywords']),
         'missing_count': len(ats_data['missing_keywords']),
         'match_percentage': round(
-            len(ats_data['matched_keywords']) / max(len(get_keywords(jd_text)), 1) * 100, 1
+            len(ats_data['matched_keywords']) / max(len(jd_features.keywords), 1) * 100, 1
         )
     }
     